@@ -41,6 +41,7 @@ class AutoGenerator(AutoModel[GeneratorWrapper]):
         name: str,
         revision: str = "main",
         device: Optional[torch.device] = None,
+        dtype: Optional[torch.dtype] = None,
         quantization_config: Optional[BitsAndBytesConfig] = None,
     ) -> GeneratorWrapper:
         # We need to match the name of the model directly as our
@@ -55,6 +56,7 @@ class AutoGenerator(AutoModel[GeneratorWrapper]):
                         name=name,
                         revision=revision,
                         device=device,
+                        dtype=dtype,
                         quantization_config=quantization_config,
                     ),
                 )
@@ -65,6 +65,7 @@ class DefaultGenerator(GeneratorWrapper, FromHFHub):
         name: str,
         revision: str = "main",
         device: Optional[torch.device] = None,
+        dtype: Optional[torch.dtype] = None,
         quantization_config: Optional[BitsAndBytesConfig] = None,
     ) -> Self:
         tokenizer = AutoTokenizer.from_hf_hub(name=name, revision=revision)
@@ -72,6 +73,7 @@ class DefaultGenerator(GeneratorWrapper, FromHFHub):
             name=name,
             revision=revision,
             device=device,
+            dtype=dtype,
             quantization_config=quantization_config,
         )
         return cls(tokenizer, causal_lm)
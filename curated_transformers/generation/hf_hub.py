@@ -25,6 +25,7 @@ class FromHFHub(ABC):
         name: str,
         revision: str = "main",
         device: Optional[torch.device] = None,
+        dtype: Optional[torch.dtype] = None,
         quantization_config: Optional[BitsAndBytesConfig] = None,
     ) -> Self:
         """
@@ -36,6 +37,10 @@ class FromHFHub(ABC):
             Model revision.
         :param device:
             Device on which to initialize the model.
+        :param dtype:
+            Data type of the model's floating point parameters. If ``None``,
+            the data type of the model configuration is used. Cannot be
+            used together with ``quantization_config``.
         :param quantization_config:
             Configuration for loading quantized weights.
         :returns:
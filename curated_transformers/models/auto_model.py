@@ -34,6 +34,7 @@ class AutoModel(ABC, Generic[ModelT]):
         name: str,
         revision: str = "main",
         device: Optional[torch.device] = None,
+        dtype: Optional[torch.dtype] = None,
         quantization_config: Optional[BitsAndBytesConfig] = None,
     ) -> ModelT:
         """
@@ -45,6 +46,10 @@ class AutoModel(ABC, Generic[ModelT]):
             Model revision.
         :param device:
             Device on which to initialize the model.
+        :param dtype:
+            Data type of the model's floating point parameters. If ``None``,
+            the data type of the model configuration is used. Cannot be
+            used together with ``quantization_config``.
         :param quantization_config:
             Configuration for loading quantized weights.
         :returns:
@@ -58,6 +63,7 @@ class AutoModel(ABC, Generic[ModelT]):
         name: str,
         revision: str,
         device: Optional[torch.device],
+        dtype: Optional[torch.dtype],
         quantization_config: Optional[BitsAndBytesConfig],
         model_type_to_class_map: Mapping[str, Type],
     ) -> FromHFHub:
@@ -73,6 +79,7 @@ class AutoModel(ABC, Generic[ModelT]):
             name=name,
             revision=revision,
             device=device,
+            dtype=dtype,
             quantization_config=quantization_config,
         )
         return module
@@ -98,10 +105,16 @@ class AutoEncoder(AutoModel[EncoderModule]):
         name: str,
         revision: str = "main",
         device: Optional[torch.device] = None,
+        dtype: Optional[torch.dtype] = None,
         quantization_config: Optional[BitsAndBytesConfig] = None,
     ) -> EncoderModule:
         encoder = cls._instantiate_module_from_hf_hub(
-            name, revision, device, quantization_config, cls._HF_MODEL_TYPE_TO_CURATED
+            name,
+            revision,
+            device,
+            dtype,
+            quantization_config,
+            cls._HF_MODEL_TYPE_TO_CURATED,
         )
         assert isinstance(encoder, EncoderModule)
         return encoder
@@ -127,10 +140,16 @@ class AutoDecoder(AutoModel[DecoderModule]):
         name: str,
         revision: str = "main",
         device: Optional[torch.device] = None,
+        dtype: Optional[torch.dtype] = None,
         quantization_config: Optional[BitsAndBytesConfig] = None,
     ) -> DecoderModule:
         decoder = cls._instantiate_module_from_hf_hub(
-            name, revision, device, quantization_config, cls._HF_MODEL_TYPE_TO_CURATED
+            name,
+            revision,
+            device,
+            dtype,
+            quantization_config,
+            cls._HF_MODEL_TYPE_TO_CURATED,
         )
         assert isinstance(decoder, DecoderModule)
         return decoder
@@ -156,10 +175,16 @@ class AutoCausalLM(AutoModel[CausalLMModule[KeyValueCache]]):
         name: str,
         revision: str = "main",
         device: Optional[torch.device] = None,
+        dtype: Optional[torch.dtype] = None,
         quantization_config: Optional[BitsAndBytesConfig] = None,
     ) -> CausalLMModule[KeyValueCache]:
         causal_lm = cls._instantiate_module_from_hf_hub(
-            name, revision, device, quantization_config, cls._HF_MODEL_TYPE_TO_CURATED
+            name,
+            revision,
+            device,
+            dtype,
+            quantization_config,
+            cls._HF_MODEL_TYPE_TO_CURATED,
         )
         assert isinstance(causal_lm, CausalLMModule)
         return causal_lm
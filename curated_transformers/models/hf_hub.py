@@ -66,6 +66,7 @@ class FromHFHub(ABC):
         name: str,
         revision: str = "main",
         device: Optional[torch.device] = None,
+        dtype: Optional[torch.dtype] = None,
         quantization_config: Optional[BitsAndBytesConfig] = None,
     ) -> Self:
         """
@@ -76,12 +77,26 @@ class FromHFHub(ABC):
         :param revision:
             Model revision.
         :param device:
-            Device on which the model is initialized.
+            Device on which the model is initialized. If ``None``, the
+            parameters stay on the CPU and are memory-mapped from the
+            cached checkpoint files when possible.
+        :param dtype:
+            Data type of the model's floating point parameters. Checkpoint
+            tensors are converted to this type while they are loaded. If
+            ``None``, the ``torch_dtype`` of the model configuration is used
+            and checkpoint tensors must be of that type. Cannot be used
+            together with ``quantization_config``.
         :param quantization_config:
             Configuration for loading quantized weights.
         :returns:
             Module with the parameters loaded.
         """
+        if dtype is not None and quantization_config is not None:
+            # Quantization determines the dtype of the parameters itself.
+            raise ValueError(
+                "`dtype` and `quantization_config` cannot be used together"
+            )
+
         # Download configuration and construct model.
         config_filename = get_model_config_filepath(name, revision)
         with open(config_filename, "r") as f:
@@ -90,12 +105,15 @@ class FromHFHub(ABC):
         model = cls.from_hf_config(hf_config=config, device=torch.device("meta"))
 
         # Convert the model to the expected dtype.
-        dtype_str = config.get("torch_dtype")
-        if dtype_str is not None:
-            dtype = getattr(torch, dtype_str, None)
-            if dtype is None or not isinstance(dtype, torch.dtype):
-                raise ValueError(f"Invalid torch dtype `{dtype_str}`")
+        if dtype is not None:
             model.to(dtype=dtype)
+        else:
+            dtype_str = config.get("torch_dtype")
+            if dtype_str is not None:
+                config_dtype = getattr(torch, dtype_str, None)
+                if config_dtype is None or not isinstance(config_dtype, torch.dtype):
+                    raise ValueError(f"Invalid torch dtype `{dtype_str}`")
+                model.to(dtype=config_dtype)
 
         # Prepare for quantization.
         if quantization_config is not None:
@@ -111,6 +129,7 @@ class FromHFHub(ABC):
             state_dict_converter=cls.convert_hf_state_dict,
             tensor_to_param_converter=tensor2param,
             device=device,
+            dtype=dtype,
         )
 
         # Ensure that any non-persistent buffers are also moved to
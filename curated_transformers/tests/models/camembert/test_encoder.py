@@ -9,7 +9,11 @@ from ..util import assert_encoder_output_equals_hf
 
 @pytest.mark.skipif(not has_hf_transformers, reason="requires huggingface transformers")
 @pytest.mark.parametrize("torch_device", TORCH_DEVICES)
-def test_encoder(torch_device):
+@pytest.mark.parametrize("with_torch_sdp", [False, True])
+def test_encoder(torch_device, with_torch_sdp):
     assert_encoder_output_equals_hf(
-        CamemBERTEncoder, "explosion-testing/camembert-test", torch_device
+        CamemBERTEncoder,
+        "explosion-testing/camembert-test",
+        torch_device,
+        with_torch_sdp=with_torch_sdp,
     )
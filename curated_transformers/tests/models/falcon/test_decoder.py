@@ -1,7 +1,9 @@
+from copy import deepcopy
+
 import pytest
 import torch
 
-from curated_transformers.layers.attention import AttentionMask
+from curated_transformers.layers.attention import AttentionMask, enable_torch_sdp
 from curated_transformers.models.falcon.decoder import FalconDecoder
 from curated_transformers.tests.util import torch_assertclose
 
@@ -38,11 +40,16 @@ FALCON_TEST_MODELS = [
 ]
 
 
-@pytest.mark.skipif(not has_hf_transformers, reason="requires huggingface transformers")
-@pytest.mark.parametrize("torch_device", TORCH_DEVICES)
-@pytest.mark.parametrize("model_revision", FALCON_TEST_MODELS)
-def test_decoder(torch_device, model_revision):
-    model, revision = model_revision
+@pytest.fixture(
+    scope="module",
+    params=FALCON_TEST_MODELS,
+    ids=[model for model, _ in FALCON_TEST_MODELS],
+)
+def falcon_models(request):
+    # Loading the models is the slowest part of these tests, so load every
+    # revision once on the CPU and share it between tests. Tests must not
+    # modify these models, but should use copies instead.
+    model, revision = request.param
 
     hf_model = transformers.AutoModel.from_pretrained(
         model,
@@ -51,19 +58,52 @@ def test_decoder(torch_device, model_revision):
         # Avoid warnings about trusting remote code without a revision.
         revision=revision,
     )
-    hf_model.to(torch_device)
     hf_model.eval()
 
-    model = FalconDecoder.from_hf_hub(
-        name=model, revision=revision, device=torch_device
-    )
+    model = FalconDecoder.from_hf_hub(name=model, revision=revision)
     model.eval()
 
+    return request.param, hf_model, model
+
+
+@pytest.mark.skipif(not has_hf_transformers, reason="requires huggingface transformers")
+@pytest.mark.parametrize("torch_device", TORCH_DEVICES)
+def test_decoder_from_hf_hub_device(falcon_models, torch_device):
+    if torch_device.type == "cpu":
+        pytest.skip("the shared models are already loaded on the CPU")
+
+    (name, revision), _, cpu_model = falcon_models
+
+    model = FalconDecoder.from_hf_hub(name=name, revision=revision, device=torch_device)
+    model.eval()
+
+    for _, param in model.state_dict().items():
+        assert param.device == torch_device
+
     torch.manual_seed(0)
-    X = torch.randint(0, hf_model.config.vocab_size, (2, 10), device=torch_device)
+    X = torch.randint(0, VOCAB_SIZE, (2, 10), device=torch_device)
 
     with torch.no_grad():
         Y = model(X).last_hidden_layer_state
+        Y_cpu = cpu_model(X.cpu()).last_hidden_layer_state
+
+    torch_assertclose(Y.cpu(), Y_cpu)
+
+
+@pytest.mark.skipif(not has_hf_transformers, reason="requires huggingface transformers")
+@pytest.mark.parametrize("torch_device", TORCH_DEVICES)
+@pytest.mark.parametrize("with_torch_sdp", [False, True])
+def test_decoder(falcon_models, torch_device, with_torch_sdp):
+    _, hf_model, model = falcon_models
+    hf_model = deepcopy(hf_model).to(torch_device)
+    model = deepcopy(model).to(torch_device)
+
+    torch.manual_seed(0)
+    X = torch.randint(0, hf_model.config.vocab_size, (2, 10), device=torch_device)
+
+    with torch.no_grad():
+        with enable_torch_sdp(with_torch_sdp):
+            Y = model(X).last_hidden_layer_state
         Y_hf = hf_model(X).last_hidden_state
 
     torch_assertclose(Y, Y_hf)
@@ -71,20 +111,16 @@ def test_decoder(torch_device, model_revision):
 
 @pytest.mark.skipif(not has_hf_transformers, reason="requires huggingface transformers")
 @pytest.mark.parametrize("torch_device", TORCH_DEVICES)
-@pytest.mark.parametrize("model_revision", FALCON_TEST_MODELS)
-def test_decoder_with_cache(torch_device, model_revision):
-    model, revision = model_revision
-
-    model = FalconDecoder.from_hf_hub(
-        name=model, revision=revision, device=torch_device
-    )
-    model.eval()
+@pytest.mark.parametrize("with_torch_sdp", [False, True])
+def test_decoder_with_cache(falcon_models, torch_device, with_torch_sdp):
+    _, _, model = falcon_models
+    model = deepcopy(model).to(torch_device)
 
     torch.manual_seed(0)
     X = torch.randint(0, VOCAB_SIZE, (2, 10), device=torch_device)
     X_rest = torch.randint(0, VOCAB_SIZE, (2, 10), device=torch_device)
 
-    with torch.no_grad():
+    with torch.no_grad(), enable_torch_sdp(with_torch_sdp):
         Y = model(X, store_cache=True)
         Y = model(X_rest, cache=Y.cache).last_hidden_layer_state
         Y_no_cache = model(torch.cat([X, X_rest], dim=1)).last_hidden_layer_state
@@ -1,6 +1,8 @@
 import pytest
+import torch
 
 from curated_transformers.models.bert.encoder import BERTEncoder
+from curated_transformers.quantization import BitsAndBytesConfig
 
 from ..compat import has_hf_transformers
 from ..conftest import TORCH_DEVICES
@@ -13,3 +15,22 @@ def test_sharded_model_checkpoints(torch_device):
     assert_encoder_output_equals_hf(
         BERTEncoder, "explosion-testing/bert-test-sharded", torch_device
     )
+
+
+@pytest.mark.parametrize("torch_device", TORCH_DEVICES)
+def test_from_hf_hub_with_dtype(torch_device):
+    model = BERTEncoder.from_hf_hub(
+        name="explosion-testing/bert-test", device=torch_device, dtype=torch.bfloat16
+    )
+    for _, param in model.state_dict().items():
+        if param.is_floating_point():
+            assert param.dtype == torch.bfloat16
+
+
+def test_from_hf_hub_dtype_with_quantization():
+    with pytest.raises(ValueError, match=r"cannot be used together"):
+        BERTEncoder.from_hf_hub(
+            name="explosion-testing/bert-test",
+            dtype=torch.bfloat16,
+            quantization_config=BitsAndBytesConfig.for_8bit(),
+        )
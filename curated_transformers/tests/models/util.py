@@ -2,7 +2,7 @@ from typing import Type
 
 import torch
 
-from curated_transformers.layers.attention import AttentionMask
+from curated_transformers.layers.attention import AttentionMask, enable_torch_sdp
 from curated_transformers.models.hf_hub import FromHFHub
 
 from ..compat import transformers
@@ -15,7 +15,8 @@ def assert_encoder_output_equals_hf(
     torch_device: torch.device,
     *,
     atol=1e-5,
-    rtol=1e-5
+    rtol=1e-5,
+    with_torch_sdp=False
 ):
     model = model_class.from_hf_hub(name=model_name, device=torch_device)
     model.eval()
@@ -31,15 +32,17 @@ def assert_encoder_output_equals_hf(
     X = torch.randint(0, hf_model.config.vocab_size, (2, 10), device=torch_device)
 
     with torch.no_grad():
-        Y = model(X).last_hidden_layer_state
+        with enable_torch_sdp(with_torch_sdp):
+            Y = model(X).last_hidden_layer_state
         Y_hf = hf_model(X).last_hidden_state
 
     torch_assertclose(Y, Y_hf, atol=atol, rtol=rtol)
 
     mask = torch.rand((2, 10), dtype=torch.float, device=torch_device) < 0.5
     with torch.no_grad():
-        Y = model(
-            X, attention_mask=AttentionMask(mask)
-        ).last_hidden_layer_state * mask.unsqueeze(-1)
+        with enable_torch_sdp(with_torch_sdp):
+            Y = model(
+                X, attention_mask=AttentionMask(mask)
+            ).last_hidden_layer_state * mask.unsqueeze(-1)
         Y_hf = hf_model(X, attention_mask=mask).last_hidden_state * mask.unsqueeze(-1)
     torch_assertclose(Y, Y_hf)
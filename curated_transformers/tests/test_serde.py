@@ -0,0 +1,118 @@
+import pytest
+import torch
+from torch.nn import Linear, Module
+
+from curated_transformers.util.serde import (
+    _TORCH_LOAD_HAS_MMAP,
+    load_model_from_checkpoints,
+)
+
+from .conftest import TORCH_DEVICES
+
+# Checkpoints are written to pytest's `tmp_path`, which is not removed when
+# a test ends. Loaded parameters may still be memory-mapped onto the files,
+# and Windows refuses to delete files with a live mapping.
+
+
+class _ToyModel(Module):
+    def __init__(self, *, device=None):
+        super().__init__()
+        self.input = Linear(4, 8, device=device)
+        self.output = Linear(8, 2, device=device)
+
+
+def _identity(state_dict):
+    return state_dict
+
+
+@pytest.mark.parametrize("torch_device", TORCH_DEVICES)
+def test_load_model_with_dtype(tmp_path, torch_device):
+    source = _ToyModel()
+    torch.save(source.state_dict(), tmp_path / "checkpoint.bin")
+    model = _ToyModel(device=torch.device("meta")).to(torch.bfloat16)
+    load_model_from_checkpoints(
+        model,
+        filepaths=[str(tmp_path / "checkpoint.bin")],
+        state_dict_converter=_identity,
+        device=torch_device,
+        dtype=torch.bfloat16,
+    )
+
+    for name, param in model.state_dict().items():
+        assert param.dtype == torch.bfloat16
+        assert param.device == torch_device
+        torch.testing.assert_close(
+            param.cpu(), source.state_dict()[name].to(torch.bfloat16)
+        )
+
+
+def test_load_model_dtype_mismatch(tmp_path):
+    source = _ToyModel()
+    torch.save(source.state_dict(), tmp_path / "checkpoint.bin")
+    model = _ToyModel(device=torch.device("meta")).to(torch.bfloat16)
+    with pytest.raises(ValueError, match=r"Expected dtype of replacement"):
+        load_model_from_checkpoints(
+            model,
+            filepaths=[str(tmp_path / "checkpoint.bin")],
+            state_dict_converter=_identity,
+        )
+
+
+@pytest.mark.parametrize("torch_device", TORCH_DEVICES)
+@pytest.mark.parametrize("zipfile_serialization", [False, True])
+def test_load_model_from_checkpoints(
+    tmp_path, monkeypatch, torch_device, zipfile_serialization
+):
+    torch_load = torch.load
+    load_kwargs = []
+
+    def recording_load(*args, **kwargs):
+        load_kwargs.append(kwargs)
+        return torch_load(*args, **kwargs)
+
+    monkeypatch.setattr(torch, "load", recording_load)
+
+    source = _ToyModel()
+    state_dict = source.state_dict()
+    # Split the parameters over two shards.
+    filepaths = [str(tmp_path / "shard-1.bin"), str(tmp_path / "shard-2.bin")]
+    for filepath, prefix in zip(filepaths, ["input.", "output."]):
+        torch.save(
+            {k: v for k, v in state_dict.items() if k.startswith(prefix)},
+            filepath,
+            _use_new_zipfile_serialization=zipfile_serialization,
+        )
+
+    model = _ToyModel(device=torch.device("meta"))
+    load_model_from_checkpoints(
+        model,
+        filepaths=filepaths,
+        state_dict_converter=_identity,
+        device=torch_device,
+    )
+
+    for name, param in model.state_dict().items():
+        assert param.device == torch_device
+        torch.testing.assert_close(param.cpu(), state_dict[name])
+
+    # Only zipfile checkpoints can be memory-mapped.
+    assert len(load_kwargs) == 2
+    for kwargs in load_kwargs:
+        assert kwargs.get("mmap", False) == (
+            zipfile_serialization and _TORCH_LOAD_HAS_MMAP
+        )
+
+
+def test_load_model_missing_keys(tmp_path):
+    source = _ToyModel()
+    state_dict = {
+        k: v for k, v in source.state_dict().items() if k.startswith("input.")
+    }
+    torch.save(state_dict, tmp_path / "checkpoint.bin")
+    model = _ToyModel(device=torch.device("meta"))
+    with pytest.raises(ValueError, match=r"output\.weight"):
+        load_model_from_checkpoints(
+            model,
+            filepaths=[str(tmp_path / "checkpoint.bin")],
+            state_dict_converter=_identity,
+        )
@@ -1,10 +1,29 @@
-from typing import Callable, Dict, Iterable, Mapping, Optional, Set, Union
+import inspect
+import zipfile
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Callable,
+    DefaultDict,
+    Dict,
+    Iterable,
+    Mapping,
+    Optional,
+    Set,
+    Union,
+)
 
 import torch
 from torch.nn import Module, Parameter
 
 from .pytorch import ModuleIterator, apply_to_module
 
+# Checkpoints are always loaded on the CPU first to support all devices.
+_CPU_DEVICE = torch.device("cpu")
+
+# `mmap` support in `torch.load` was added in PyTorch 2.1.
+_TORCH_LOAD_HAS_MMAP = "mmap" in inspect.signature(torch.load).parameters
+
 # Args: Parent module, module prefix, parameter name, tensor to convert, device.
 # Returns the new paramater.
 TensorToParameterConverterT = Callable[
@@ -25,6 +44,7 @@ def load_model_from_checkpoints(
     state_dict_converter: HFStateDictConverterT,
     tensor_to_param_converter: Optional[TensorToParameterConverterT] = None,
     device: Optional[torch.device] = None,
+    dtype: Optional[torch.dtype] = None,
 ):
     """
     Load parameters from PyTorch checkpoints with minimal copies.
@@ -40,32 +60,46 @@ def load_model_from_checkpoints(
         Callback to perform custom conversions of the loaded parameters.
         Useful for loading quantized weights.
     :param device:
-        Device in which to place the loaded parameters.
+        Device in which to place the loaded parameters. If ``None``, the
+        parameters are kept on the CPU. Checkpoints are memory-mapped when
+        possible (PyTorch 2.1+), so these parameters are then backed by the
+        checkpoint files and read from disk when first accessed. Changes to
+        the parameters are not written back to the files.
+    :param dtype:
+        Data type to convert floating point tensors to before they are
+        placed in the model. If ``None``, the tensors must have the same
+        data type as the parameters and buffers they replace.
     """
     state_dicts = _load_state_dicts_from_checkpoints(filepaths)
+    # The module tree is traversed once and the modules are shared by all
+    # state dicts. Loading replaces parameters and buffers, but does not
+    # replace modules.
+    modules = _get_modules_by_prefix(model)
     # We need to cache the model's parameter keys before loading the state
     # dicts as the process could potentially change the structure of sub-modules,
     # e.g: when quantized layers rename their parameters.
-    module_keys = set(model.state_dict().keys())
-    seen_keys: Set[str] = set()
+    #
+    # Keys are removed as they are loaded, so that only the keys that are
+    # still missing are retained.
+    missing_keys = _get_module_state_dict_keys(modules)
 
     for state_dict in state_dicts:
         converted = state_dict_converter(state_dict)
         if len(converted) == 0:
             continue
-        seen_keys.update(converted.keys())
+        missing_keys.difference_update(converted.keys())
 
-        # We have to walk the module tree for each state dict as there
-        # are no guarantees on the ordering of the keys.
+        # There are no guarantees on the ordering of the keys, so every
+        # state dict is emplaced separately.
         _emplace_module_state_dict(
-            model,
+            modules,
             converted,
             tensor_to_param_converter=tensor_to_param_converter,
             device=device,
+            dtype=dtype,
         )
 
     # Make sure that we didn't miss any keys.
-    missing_keys = module_keys.difference(seen_keys)
     if len(missing_keys) != 0:
         raise ValueError(f"Some parameters were not updated/replaced: {missing_keys}")
 
@@ -99,67 +133,130 @@ def default_tensor_to_parameter_converter(
     return Parameter(tensor, requires_grad=old_param.requires_grad).to(device=device)  # type: ignore
 
 
+def _get_modules_by_prefix(module: Module) -> Dict[str, Module]:
+    # Shared modules are included once for every prefix that they are
+    # reachable by, as in ``module.state_dict()``.
+    modules: Dict[str, Module] = {}
+
+    def apply(itr: ModuleIterator):
+        modules[itr.prefix] = itr.module
+
+    apply_to_module(module, apply)
+    return modules
+
+
+def _get_module_state_dict_keys(modules: Mapping[str, Module]) -> Set[str]:
+    # Collect the keys of ``module.state_dict()`` without constructing
+    # the state dict.
+    keys: Set[str] = set()
+    for prefix, module in modules.items():
+        prefix_with_dot = f"{prefix}." if prefix else ""
+        for name, param in module._parameters.items():
+            if param is not None:
+                keys.add(f"{prefix_with_dot}{name}")
+        for name, buf in module._buffers.items():
+            if buf is not None and name not in module._non_persistent_buffers_set:
+                keys.add(f"{prefix_with_dot}{name}")
+    return keys
+
+
 def _load_state_dicts_from_checkpoints(
     filepaths: Iterable[str],
 ) -> Iterable[Mapping[str, torch.Tensor]]:
-    for path in filepaths:
-        # Map to CPU first to support all devices.
-        state_dict = torch.load(
-            path, map_location=torch.device("cpu"), weights_only=True
-        )
-        yield state_dict
+    # The next checkpoint is read on a worker thread while the current one
+    # is converted and emplaced. Only one checkpoint is read ahead, to bound
+    # peak memory use. State dicts are yielded in the order of the file paths.
+    #
+    # This mainly helps checkpoints that cannot be memory-mapped. Loading
+    # memory-mapped checkpoints only reads their metadata; tensor data is
+    # paged in when the tensors are used.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending: Optional[Future] = None
+        for path in filepaths:
+            future = executor.submit(_load_state_dict_from_checkpoint, path)
+            if pending is not None:
+                yield pending.result()
+            pending = future
+        if pending is not None:
+            yield pending.result()
+
+
+def _load_state_dict_from_checkpoint(path: str) -> Mapping[str, torch.Tensor]:
+    # When possible, memory-map the checkpoint so that tensor data is paged
+    # in on demand rather than eagerly read into memory. This is only
+    # supported for the zipfile-based serialization format.
+    if _TORCH_LOAD_HAS_MMAP and zipfile.is_zipfile(path):
+        return torch.load(path, map_location=_CPU_DEVICE, weights_only=True, mmap=True)
+    return torch.load(path, map_location=_CPU_DEVICE, weights_only=True)
 
 
 def _emplace_module_state_dict(
-    module: Module,
+    modules: Mapping[str, Module],
     state_dict: Mapping[str, torch.Tensor],
     *,
     tensor_to_param_converter: Optional[TensorToParameterConverterT] = None,
     device: Optional[torch.device] = None,
+    dtype: Optional[torch.dtype] = None,
 ):
     if tensor_to_param_converter is None:
         tensor_to_param_converter = default_tensor_to_parameter_converter
 
-    def apply(itr: ModuleIterator):
-        prefix_with_dot = f"{itr.prefix}."
-        candidate_tensors = {
-            k: v for k, v in state_dict.items() if k.startswith(prefix_with_dot)
-        }
-        if len(candidate_tensors) == 0:
-            return
+    # Group the tensors by the prefix of the module that they belong to.
+    # This allows us to look up the modules that have tensors in the state
+    # dict directly.
+    module_tensors: DefaultDict[str, Dict[str, torch.Tensor]] = defaultdict(dict)
+    for key, tensor in state_dict.items():
+        prefix, _, name = key.rpartition(".")
+        module_tensors[prefix][name] = tensor
+
+    for prefix, candidate_tensors in module_tensors.items():
+        submodule = modules.get(prefix)
+        if submodule is None:
+            # Not a module in the model, so there's nothing to replace.
+            continue
+
+        if not submodule._parameters and not submodule._buffers:
+            continue
+
+        # PyTorch already refuses to register a buffer with the name of a
+        # parameter (and vice versa), so this is only checked in debug mode.
+        assert submodule._parameters.keys().isdisjoint(
+            submodule._buffers.keys()
+        ), f"Keys used in both learnable parameters and buffers in module `{prefix}`"
 
+        non_persistent_buffers = submodule._non_persistent_buffers_set
         local_params_and_buffers: Dict[
             str, Union[Optional[Parameter], Optional[torch.Tensor]]
-        ] = dict(itr.module._parameters.items())
-        for name, buf in itr.module._buffers.items():
-            if name in local_params_and_buffers:
-                raise KeyError(
-                    f"Key `{name}` used in both learnable parameters and buffers in module `{itr.prefix}`"
-                )
-            elif name not in itr.module._non_persistent_buffers_set:
-                local_params_and_buffers[name] = buf
+        ] = {
+            **submodule._parameters,
+            **{
+                name: buf
+                for name, buf in submodule._buffers.items()
+                if name not in non_persistent_buffers
+            },
+        }
 
         for name, param in local_params_and_buffers.items():
-            key = f"{prefix_with_dot}{name}"
-            if key not in candidate_tensors:
+            replacement = candidate_tensors.get(name)
+            if replacement is None:
                 continue
             elif param is None:
                 raise ValueError(
-                    f"Key `{name}` found in state dict but no data in module `{itr.prefix}`"
+                    f"Key `{name}` found in state dict but no data in module `{prefix}`"
                 )
-            replacement = candidate_tensors[key]
-            assert tensor_to_param_converter is not None
+            elif dtype is not None and replacement.is_floating_point():
+                # Convert before moving the tensor to the device, so that
+                # only the converted tensor is transferred.
+                replacement = replacement.to(dtype=dtype)
             _emplace_module_tensor(
-                module=itr.module,
-                module_prefix=itr.prefix,
+                module=submodule,
+                module_prefix=prefix,
                 tensor_name=name,
                 replacement_tensor=replacement,
                 tensor_to_param_converter=tensor_to_param_converter,
                 device=device,
             )
 
-    apply_to_module(module, apply)
-
 
 def _emplace_module_tensor(
     module: Module,
@@ -200,11 +297,16 @@ def _validate_replacement(
     replacement: torch.Tensor,
     name: str,
 ):
+    # This is called for every loaded tensor, so the common case where
+    # the replacement is valid is checked with a single comparison.
+    if (replaced.shape, replaced.dtype) == (replacement.shape, replacement.dtype):
+        return
+
     if replaced.shape != replacement.shape:
         raise ValueError(
             f"Expected size of replacement for `{name}` to be {replaced.shape}, but got {replacement.shape}"
         )
-    elif replaced.dtype != replacement.dtype:
+    else:
         raise ValueError(
             f"Expected dtype of replacement for `{name}` to be {replaced.dtype}, but got {replacement.dtype}"
         )